@@ -40,25 +40,49 @@
 # Any moral rights which are necessary to exercise under the above
 # license grant are also deemed granted under this license.
 
-from .content import Content
-from .exception import BBFReportException
-from .format import Format
-from .logging import Logging
-from .layout import Doc as LayoutDoc
-from .macro import Macro
-from .macros import DummyMacros
-# XXX it's hard to know which node types to import; perhaps the main
-#     "public" elements, and others as needed (can always get them from
-#     bbfreport.node)
-from .node import DataType, DataTypeAccessor, Dm_document, Root, Xml_file
-from .parser import Parser
-from .plugin import Plugin
-from .property import Null
-from .transform import Transform
-# XXX should import more? or just import directly from bbfreport.utility
-from .utility import Utility, Version
+import importlib
+import os
+import sys
+import warnings
+
+# version.py (which is generated) contains only these constants, so accessing
+# them doesn't import anything else
 from .version import __version__, __version_date__
 
+# the public names are defined in _api.py, which doesn't import anything
+from ._api import __all__, _deprecated, _lazy
+
+# type checkers use __init__.pyi, which declares the lazily-imported public
+# names
+
+# PEP 562 module __getattr__(); when a submodule is imported, all the public
+# names that it provides are cached in the module globals, so this is only
+# called once per submodule (deprecated names aren't cached, so that every
+# access can generate a warning)
+def __getattr__(name: str):
+    if name not in _lazy:
+        raise AttributeError('module %r has no attribute %r' % (
+            __name__, name))
+    module_name, attr_name = _lazy[name]
+    if name in _deprecated:
+        warnings.warn('%s.%s is deprecated; import it from %s%s instead' % (
+            __name__, name, __name__, module_name), DeprecationWarning,
+            stacklevel=2)
+    # the submodule might already have been imported, e.g., by another
+    # submodule, in which case there's no need to call the import machinery
+    module = sys.modules.get(__name__ + module_name) or \
+        importlib.import_module(module_name, __name__)
+    globals_ = globals()
+    for name_, (module_name_, attr_name_) in _lazy.items():
+        if module_name_ == module_name and name_ not in _deprecated:
+            globals_[name_] = getattr(module, attr_name_)
+    return getattr(module, attr_name)
+
+
+# this is calculated once (at the end of this file), and dir() sorts it
+def __dir__() -> tuple[str, ...]:
+    return _dir
+
 
 # use this when reporting the version
 def version(*, as_markdown: bool = False) -> str:
@@ -74,3 +98,15 @@ def version(*, as_markdown: bool = False) -> str:
 
     return '%s %s %s (%s version)' % (bbf, package,
                                       __version__, __version_date__)
+
+
+# only the public API is listed (not implementation imports and internals)
+_dir = tuple(sorted(set(__all__) | (_lazy.keys() - _deprecated) | {
+    '__all__', '__doc__', '__name__', '__version__', '__version_date__'}))
+
+# if requested, import everything now (so any import errors are reported
+# immediately rather than when the names are first accessed)
+if os.environ.get('BBFREPORT_EAGER_IMPORT'):
+    for _name in _lazy.keys() - _deprecated:
+        __getattr__(_name)
+    del _name
@@ -0,0 +1,60 @@
+"""Type stubs for the ``bbfreport`` package (the public names are imported
+lazily, so type checkers can't otherwise see them)."""
+
+# Copyright (c) 2024, Broadband Forum
+#
+# Redistribution and use in source and binary forms, with or
+# without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials
+#    provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+# NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+# ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# The above license is used as a license under copyright only.
+# Please reference the Forum IPR Policy for patent licensing terms
+# <https://www.broadband-forum.org/ipr-policy>.
+#
+# Any moral rights which are necessary to exercise under the above
+# license grant are also deemed granted under this license.
+
+# the deprecated names (see _api.py) aren't declared, so type checkers and
+# IDEs don't present them as supported; names in __all__ are re-exported,
+# which is how LayoutDoc (which is renamed) is exported
+from .format import Format as Format
+from .layout import Doc as LayoutDoc
+from .node import Root as Root
+from .parser import Parser as Parser
+from .plugin import Plugin as Plugin
+from .transform import Transform as Transform
+
+__all__ = ('Format', 'LayoutDoc', 'Parser', 'Plugin', 'Root', 'Transform',
+           'version')
+__version__: str
+__version_date__: str
+
+
+def version(*, as_markdown: bool = ...) -> str: ...
@@ -0,0 +1,75 @@
+"""The ``bbfreport`` package's public namespace."""
+
+# Copyright (c) 2024, Broadband Forum
+#
+# Redistribution and use in source and binary forms, with or
+# without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials
+#    provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+# NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+# ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# The above license is used as a license under copyright only.
+# Please reference the Forum IPR Policy for patent licensing terms
+# <https://www.broadband-forum.org/ipr-policy>.
+#
+# Any moral rights which are necessary to exercise under the above
+# license grant are also deemed granted under this license.
+
+__all__ = ('Format', 'LayoutDoc', 'Parser', 'Plugin', 'Root', 'Transform',
+           'version')
+
+# public names are imported from their submodules on first access (see
+# __getattr__() in __init__.py), so importing the package doesn't import
+# everything; each value is a (relative module name, attribute name) tuple
+# (the keys are identifier-like string literals, so they're already interned)
+# note that other names should be imported directly from their submodules,
+# e.g., bbfreport.node or bbfreport.utility
+_lazy = {
+    'BBFReportException': ('.exception', 'BBFReportException'),
+    'Content': ('.content', 'Content'),
+    'DataType': ('.node', 'DataType'),
+    'DataTypeAccessor': ('.node', 'DataTypeAccessor'),
+    'Dm_document': ('.node', 'Dm_document'),
+    'Format': ('.format', 'Format'),
+    'LayoutDoc': ('.layout', 'Doc'),
+    'Logging': ('.logging', 'Logging'),
+    'Macro': ('.macro', 'Macro'),
+    'Null': ('.property', 'Null'),
+    'Parser': ('.parser', 'Parser'),
+    'Plugin': ('.plugin', 'Plugin'),
+    'Root': ('.node', 'Root'),
+    'Transform': ('.transform', 'Transform'),
+    'Xml_file': ('.node', 'Xml_file')
+}
+
+# these names are no longer public (nothing imports them from the package),
+# so accessing them generates a deprecation warning; they'll be removed in a
+# future release
+_deprecated = frozenset({'BBFReportException', 'Content', 'DataType',
+                         'DataTypeAccessor', 'Dm_document', 'Logging',
+                         'Macro', 'Null', 'Xml_file'})
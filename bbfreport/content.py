@@ -693,8 +693,10 @@ class Content:
         else:
             raise NotImplementedError
 
+    # this is equivalent to len(str(self)) > 0 but avoids concatenating the
+    # text and footer (content is tested like this very frequently)
     def __bool__(self) -> bool:
-        return len(str(self)) > 0
+        return bool(self._text or self._footer)
 
     def __str__(self) -> str:
         # XXX is this the correct way to handle the footer?
@@ -58,6 +58,8 @@ class Macro:
     _macros = {}
 
     _many_newlines = re.compile(r'\n{3,}')
+    _escape_pattern = re.compile(r'([{|}])')
+    _unescape_pattern = re.compile(r'\\([{|}])')
 
     # note the use of macro_ prefixes to avoid conflict with argument names
     # XXX it would be better instead to use arg_ prefixes for arguments!
@@ -414,7 +416,7 @@ class Macro:
         if not ('{' in text or '|' in text or '}' in text):
             return text
         else:
-            return re.sub(r'([{|}])', r'\\\1', text)
+            return cls._escape_pattern.sub(r'\\\1', text)
 
     # unescape previously-escaped macro references
     @classmethod
@@ -422,7 +424,7 @@ class Macro:
         if not ('{' in text or '|' in text or '}' in text):
             return text
         else:
-            return re.sub(r'\\([{|}])', r'\1', text)
+            return cls._unescape_pattern.sub(r'\1', text)
 
     # clean up by removing some macro references
     # XXX this is heuristic, and has knowledge of some macros; should get
@@ -469,3 +471,10 @@ class Macro:
         return '%s(%s)' % (self._name, ', '.join(args))
 
     __repr__ = __str__
+
+
+# the built-in macros register themselves when they're imported; importing
+# them here (at the end, because they import this module) ensures that they
+# are always available
+# noinspection PyUnresolvedReferences
+from . import macros as _macros  # noqa: E402,F401
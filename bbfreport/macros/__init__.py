@@ -44,6 +44,7 @@
 # files, this will need to be updated to import all of these files
 from .macros import *
 
-# this just provides a definition with a known name that can be imported by
-# the main package
+# this just provides a definition with a known name that can be imported
+# (the main package used to import it, but it no longer does, because the
+# macros are now imported by bbfreport.macro)
 DummyMacros = None
@@ -50,6 +50,7 @@ Note::
 
 import re
 
+from functools import cache, lru_cache
 from typing import Any, cast, Union
 
 from ..content import CLOSE_DIV, Content, OPEN_DIV
@@ -67,6 +68,19 @@ from ..utility import ScopeEnum, StatusEnum, Utility
 # can change this while debugging
 MACROS_PATH_QUIET = PATH_QUIET
 
+# precompiled patterns (macros are expanded many times per report, so it's
+# worth avoiding the re module's cache lookups)
+ref_prefix_pattern = re.compile(r'^#*\.*')
+whitespace_pattern = re.compile(r'\s+')
+newlines_pattern = re.compile(r'\n+')
+sentence_end_pattern = re.compile(r'[.!?]$')
+digit_pattern = re.compile(r'\d')
+trname_pattern = re.compile(r'^(TR)-(\d+)(?:i(\d+))?(?:a(\d+))?(?:c(\d+))?$')
+angle_bracket_pattern = re.compile(r'([<>])')
+model_version_pattern = re.compile(r':.*')
+vowel_pattern = re.compile(r'^[aeiou]')
+single_pattern = re.compile(r'single.*')
+
 # XXX should decide whether to subclass; it's simpler not to...
 
 # XXX should use libraries, e.g., for anchor/link names
@@ -104,9 +118,12 @@ NodeType = type['Node']
 #     several types? (but should use the class hierarchy for this)
 def cast_node(node_type_or_types: Union[NodeType, tuple[NodeType, ...]],
               node: NodeType, *, prefix: str = '') -> NodeType:
-    node_types = node_type_or_types \
-        if isinstance(node_type_or_types, tuple) else (node_type_or_types,)
-    if not isinstance(node, node_types):
+    # isinstance() accepts a type or a tuple of types, so the tuple is only
+    # needed for the error message
+    if not isinstance(node, node_type_or_types):
+        node_types = node_type_or_types \
+            if isinstance(node_type_or_types, tuple) else \
+            (node_type_or_types,)
         sep = ' ' if prefix else ''
         typenames = Utility.nicer_list([typename(nt) for nt in node_types])
         raise MacroException('%s%sonly valid in %s (not in %s) descriptions'
@@ -130,21 +147,73 @@ def find_node(node_type: NodeType, *key, prefix: str = '') -> NodeType:
 #   rather than in the context of the parameter
 # XXX see also lint.visit__has_content(), which has similar logic; this
 #     should be hidden in a utility (where?)
+# XXX the expanded markdown isn't stored, because it might have been
+#     expanded in the wrong context (see above), and because the 'lint'
+#     transform only expands (and reports on) content with no markdown
 def get_markdown(content: Content, *, node, force: bool = False,
                  **kwargs) -> str:
-    markdown = ''
-    if content:
-        markdown = content.markdown or ''
-        if force or not markdown:
-            markdown = Macro.expand(content, node=node, **kwargs)
-    return markdown
+    if not content:
+        return ''
+    if not force and (markdown := content.markdown):
+        return markdown
+    return Macro.expand(content, node=node, **kwargs)
+
+
+# return a warning function that prefixes its messages
+def prefixed_warning(warning, prefix: str):
+    def func(text: str) -> None:
+        warning(f'{prefix}: {text}')
+    return func
+
+
+# follow a reference; when quiet, the result is cached, because the same
+# references are followed many times and (once the node tree is complete)
+# the result can't change (follow_reference()'s entity map is also only
+# calculated once); when not quiet, it's not cached, so errors will always
+# be reported; the cache is bounded (it holds nodes) and is cleared by
+# clear_caches() when a report starts
+def follow_reference_cached(node, ref: str, *, scope: str,
+                            quiet: bool) -> Any:
+    return follow_reference_quiet(node, ref, scope) if quiet else \
+        follow_reference(node, ref, scope=scope, quiet=False)
+
+
+@lru_cache(maxsize=1 << 16)
+def follow_reference_quiet(node, ref: str, scope: str) -> Any:
+    return follow_reference(node, ref, scope=scope, quiet=True)
+
+
+# clear the caches that hold nodes (so the previous report's node tree can be
+# garbage collected and isn't used); this should be called when a report
+# starts
+def clear_caches() -> None:
+    follow_reference_quiet.cache_clear()
+
+
+# used by expand_itemref() and expand_value()
+macro_to_elemname = {'param': 'parameter'}
+scope_values = frozenset(ScopeEnum.values)
+status_values = frozenset(StatusEnum.values)
+
+# statuses that can be passed as {{reference}} options
+status_options = frozenset({'deprecated', 'obsoleted', 'deleted'})
+
+# StatusEnum instances are immutable, so can be shared
+status_enums = {value: StatusEnum(value) for value in StatusEnum.values}
+
+
+# return the StatusEnum for a status value
+def status_enum(value: str) -> StatusEnum:
+    return status_enums.get(value) or StatusEnum(value)
 
 
 # filter out known keyword arguments
+known_kwargs = frozenset({'macro', 'node', 'active', 'error', 'warning',
+                          'info', 'debug'})
+
+
 def unknown_kwargs(**kwargs) -> dict[str, Any]:
-    return {n: v for n, v in kwargs.items() if
-            n not in {'macro', 'node', 'active', 'error', 'warning', 'info',
-                      'debug'}}
+    return {n: v for n, v in kwargs.items() if n not in known_kwargs}
 
 
 # helpers are declared next
@@ -152,7 +221,7 @@ def unknown_kwargs(**kwargs) -> dict[str, Any]:
 # the returned text can include a macro references, so the caller should
 # return a Content object
 def maybe_empty(text: str) -> str:
-    return '{{empty}}' if text == '' else '*%s*' % text
+    return '{{empty}}' if text == '' else f'*{text}*'
 
 
 def expand_itemref(ref, scope_or_status, *, node, stack, warning,
@@ -164,16 +233,8 @@ def expand_itemref(ref, scope_or_status, *, node, stack, warning,
     assert macro.name in {'command', 'event', 'param', 'object'}
 
     # map macro name to element name
-    macro_to_elemname = {'param': 'parameter'}
     elemname = macro_to_elemname.get(macro.name, macro.name)
 
-    # separate out scope and status
-    # XXX should make better use of the ScopeEnum and StatusEnum classes
-    scope = scope_or_status if scope_or_status in {
-        'normal', 'model', 'object', 'absolute'} else 'normal'
-    status = StatusEnum(scope_or_status if scope_or_status in StatusEnum.values
-                        else node.status_inherited.value)
-
     # warn if the reference has leading and/or trailing whitespace
     if ref != ref.strip():
         warning('{{%s}}: argument %r has leading and/or trailing whitespace'
@@ -182,7 +243,13 @@ def expand_itemref(ref, scope_or_status, *, node, stack, warning,
 
     # if not within a model, don't attempt to follow the reference
     if not node.model_in_path:
-        return "*%s*" % (ref or elemname,)
+        return f'*{ref or elemname}*'
+
+    # separate out scope and status
+    # XXX should make better use of the ScopeEnum and StatusEnum classes
+    scope = scope_or_status if scope_or_status in scope_values else 'normal'
+    status = status_enum(scope_or_status if scope_or_status in status_values
+                         else node.status_inherited.value)
 
     # if there's no reference, it's a reference to the current item
     if ref == '':
@@ -191,18 +258,16 @@ def expand_itemref(ref, scope_or_status, *, node, stack, warning,
             raise MacroException('empty ref only valid in %s descriptions' %
                                  elemname)
         if item is node.parent:
-            return "*%s*" % nameonly(item)
+            return f'*{nameonly(item)}*'
         else:
-            return "[*%s*](#%s)" % (nameonly(item), item.anchor)
+            return f'[*{nameonly(item)}*](#{item.anchor})'
 
     # otherwise follow the reference
-    ref_node = follow_reference(node, ref, scope=scope,
-                                quiet=MACROS_PATH_QUIET)
+    ref_node = follow_reference_cached(node, ref, scope=scope,
+                                       quiet=MACROS_PATH_QUIET)
     if not ref_node:
         raise MacroException('non-existent %s' % ref)
     elif ref_node.elemname != elemname:
-        ref_node = follow_reference(node, ref, scope=scope,
-                                    quiet=MACROS_PATH_QUIET)
         raise MacroException('referenced %s is %s, not %s' % (
             ref, ref_node.elemname, elemname))
     elif ref_node is node.parent:
@@ -217,10 +282,10 @@ def expand_itemref(ref, scope_or_status, *, node, stack, warning,
 
     # remove leading hashes and dots from the reference; if this gives an
     # empty string, e.g., {{object|#}}, use the actual name
-    ref = re.sub(r'^#*\.*', '', ref)
+    ref = ref_prefix_pattern.sub('', ref)
     if ref == '':
         ref = nameonly(ref_node)
-    return "[*%s*](#%s)" % (ref, ref_node.anchor)
+    return f'[*{ref}*](#{ref_node.anchor})'
 
 
 # behavior depends on the arguments:
@@ -238,12 +303,10 @@ def expand_value(value, param, scope_or_status, *, node, stack, args,
     if value == '' and param != '':
         raise MacroException('empty value but non-empty param')
 
-    # separate out scope and status
+    # determine status (scope is only needed within a model)
     # XXX should make better use of the ScopeEnum and StatusEnum classes
-    scope = scope_or_status if scope_or_status in {
-        'normal', 'model', 'object', 'absolute'} else 'normal'
-    status = StatusEnum(scope_or_status if scope_or_status in StatusEnum.values
-                        else node.status_inherited.value)
+    status = status_enum(scope_or_status if scope_or_status in status_values
+                         else node.status_inherited.value)
 
     # if not within a model, the node should be a data type description
     if not node.model_in_path:
@@ -254,22 +317,25 @@ def expand_value(value, param, scope_or_status, *, node, stack, args,
 
     # if within a model, find the current or referenced parameter
     else:
+        scope = scope_or_status if scope_or_status in scope_values else \
+            'normal'
         if param == '':
             parameter = node.parameter_in_path
             if not parameter:
                 raise MacroException('empty param arg only valid in parameter '
                                      'descriptions')
         else:
-            parameter = follow_reference(node, param, scope=scope, quiet=True)
+            parameter = follow_reference_cached(node, param, scope=scope,
+                                                quiet=True)
             if not parameter:
                 raise MacroException('non-existent %s' % param)
 
         # if it's an enumerationRef, replace it with the referenced parameter
         if enumeration_ref := parameter.syntax.string.enumerationRef:
-            if not enumeration_ref.targetParamNode:
+            if not (target := enumeration_ref.targetParamNode):
                 raise MacroException('non-existent enumerationRef parameter '
                                      '%s' % enumeration_ref.targetParam)
-            parameter = enumeration_ref.targetParamNode
+            parameter = target
 
         # the owner of the values is the parameter's Syntax object
         owner = parameter.syntax
@@ -301,7 +367,7 @@ def expand_value(value, param, scope_or_status, *, node, stack, args,
                 value_node.objpath, value))
 
         style = '*' if macro.name == 'enum' else '`'
-        return "[%s%s%s](#%s)" % (style, value, style, values[value].anchor)
+        return f'[{style}{value}{style}](#{value_node.anchor})'
 
 
 # this is called by expand_value()
@@ -322,46 +388,54 @@ def expand_values(values: dict[str, _ValueFacet], *, owner, stack, warning,
     #     text must be in a new paragraph
     assert len(caller.args) > 1  # safe, because it calls this macro!
     content = caller.args[1]
-    text = '{{np}}' if any(
-            isinstance(item, MacroRef) and item.name == 'li' for item in
-            content.items) else '{{ns}}'
-
-    text += \
+    # (MacroRef isn't subclassed, so an exact type check is sufficient)
+    has_li = False
+    for item in content.items:
+        if type(item) is MacroRef and item.name == 'li':
+            has_li = True
+            break
+    chunks = ['{{np}}' if has_li else '{{ns}}']
+
+    is_enum = macro.name == 'enum'
+    chunks.append(
         ('Each list item is an enumeration of:' if owner.list else
-         'Enumeration of:') if macro.name == 'enum' else \
+         'Enumeration of:') if is_enum else
         ('Each list item matches one of:' if owner.list else
-         'Possible patterns:')
-    text += '{{np}}'
+         'Possible patterns:'))
+    chunks.append('{{np}}')
 
-    for key, value in values.items():
-        # XXX this is tricky; the supplied warning is bound to node, so
-        #     messages won't indicate the value; this prefixes the
-        #     value (it would be nice to have a way of inserting it or
-        #     (better?) overriding the node
-        my_warning = lambda txt: warning('%s: %s' % (value.value, txt))
+    # empty key is reported as '<Empty>', with default '{{empty}}' content
+    empty = '<Empty>'
 
+    for key, value in values.items():
         # not value.description because the description may be inherited
         description = owner.value_description(value)
         content = description.content
 
-        # empty key is reported as '<Empty>', with default '{{empty}}' content
-        empty = '<Empty>'
         if key == '':
             key = empty
             if not content:
                 content = Content('{{empty|nocapitalize}}')
         # enums are italicized with escaped angle brackets; patterns are
         # verbatim
-        if macro.name != 'enum' and key != empty:
+        if not is_enum and key != empty:
             style = '`'
         else:
             style = '*'
-            key = re.sub(r'([<>])', r'\\\1', key)
-        text += '* [%s%s%s]{#%s}' % (style, key, style, value.anchor)
+            key = angle_bracket_pattern.sub(r'\\\1', key)
+        chunks.append('* [%s%s%s]{#%s}' % (style, key, style, value.anchor))
 
         # process the description
-        markdown = get_markdown(content, node=description, stack=stack,
-                                warning=my_warning, **kwargs)
+        # XXX this is tricky; the supplied warning is bound to node, so
+        #     messages won't indicate the value; this prefixes the
+        #     value (it would be nice to have a way of inserting it or
+        #     (better?) overriding the node
+        #     (the prefixed warning is only needed if the markdown hasn't
+        #     already been generated)
+        if not content or not (markdown := content.markdown):
+            markdown = get_markdown(
+                    content, node=description, stack=stack,
+                    warning=prefixed_warning(warning, value.value), **kwargs)
 
         # suppress tidy-up if the markdown ends with '\n:::' (a fenced div)
         # XXX also need the leading '\n\n'
@@ -369,11 +443,14 @@ def expand_values(values: dict[str, _ValueFacet], *, owner, stack, warning,
         if markdown.endswith('\n:::'):
             markdown = '{{np}}' + markdown + '{{np}}'
         else:
-            # replace newlines with single spaces
-            markdown = re.sub(r'\n+', ' ', markdown)
+            # replace newlines with single spaces (most descriptions are a
+            # single line, so check first)
+            if '\n' in markdown:
+                markdown = newlines_pattern.sub(' ', markdown)
 
             # remove trailing period (if present)
-            markdown = re.sub(r'\.$', '', markdown)
+            if markdown.endswith('.'):
+                markdown = markdown[:-1]
 
         # items will be concatenated with comma separators
         items = [markdown] if markdown else []
@@ -401,10 +478,11 @@ def expand_values(values: dict[str, _ValueFacet], *, owner, stack, warning,
         markdown = ', '.join(items)
 
         # append the final markdown, if there is any
-        text += ' (%s)' % markdown if markdown else ''
-        text += '{{nl}}'
+        if markdown:
+            chunks.append(' (%s)' % markdown)
+        chunks.append('{{nl}}')
 
-    return Content(text)
+    return Content(''.join(chunks))
 
 
 # the remainder are defined in alphabetical order for ease of reference
@@ -412,7 +490,7 @@ def expand_values(values: dict[str, _ValueFacet], *, owner, stack, warning,
 # noinspection PyShadowingBuiltins
 def expand_abbref(id, **_kwargs) -> str:
     item = find_node(AbbreviationsItem, id)
-    return '[%s](#%s)' % (item.id, item.anchor)
+    return f'[{item.id}](#{item.anchor})'
 
 
 def expand_access(node, **_kwargs) -> str:
@@ -428,12 +506,19 @@ def expand_access(node, **_kwargs) -> str:
 def expand_bibref(id, section, **_kwargs) -> str:
     # XXX unfortunately some IDs contain spaces, and so can get broken across
     #     two lines
-    bibref = find_node(Reference, re.sub(r'\s+', ' ', id))
+    bibref = find_node(Reference, whitespace_pattern.sub(' ', id))
     section_ = ''
     if section:
-        prefix = 'Section ' if re.match(r'\d', section) else ''
-        section_ = '%s%s/' % (prefix, Utility.upper_first(section))
-    return '[[%s%s](#%s)]' % (section_, bibref.id, bibref.anchor)
+        prefix = 'Section ' if digit_pattern.match(section) else ''
+        section_ = f'{prefix}{Utility.upper_first(section)}/'
+    return f'[[{section_}{bibref.id}](#{bibref.anchor})]'
+
+
+# boilerplate text; the Content objects aren't shared, because they're
+# mutable (Macro.expand() sets their markdown)
+command_parameter_text = 'The value of this parameter is not part of the ' \
+                         'device configuration and is always {{null}} when ' \
+                         'read.'
 
 
 def expand_command(ref, scope_or_status, *, node, **_kwargs) -> \
@@ -441,9 +526,7 @@ def expand_command(ref, scope_or_status, *, node, **_kwargs) -> \
     # handle the legacy 'command parameter' case
     if ref == '' and isinstance(node.parent, Parameter) and \
             node.parent.syntax.command:
-        return Content('The value of this parameter is not part of the '
-                       'device configuration and is always {{null}} when '
-                       'read.')
+        return Content(command_parameter_text)
 
     return expand_itemref(ref, scope_or_status, node=node, **_kwargs)
 
@@ -459,7 +542,7 @@ def expand_datatype(arg, *, node: _HasContent, **kwargs) -> Content:
 
     _, data_type = name_and_data_type
     data_type.mark_used()
-    text = '[[%s](#%s)]' % (data_type.name_public, data_type.anchor)
+    text = f'[[{data_type.name_public}](#{data_type.anchor})]'
 
     # XXX there might be other places where .description should be changed to
     #     .description_inherited; in this case it was needed for a data type
@@ -468,7 +551,7 @@ def expand_datatype(arg, *, node: _HasContent, **kwargs) -> Content:
     if arg == 'expand' and (markdown := get_markdown(
             description.content, node=parameter.description, force=True,
             noauto=True, **kwargs)):
-        text += ' %s' % markdown
+        text += f' {markdown}'
 
     return Content(text)
 
@@ -477,18 +560,11 @@ def expand_diffs(node, diffs, **_kwargs) -> Content:
     model = node.model_in_path
     version = model.model_version if model else None
 
-    # noinspection PyListCreation
-    chunks = []
-    chunks.append(OPEN_DIV)
-    chunks.append('{{div|diffs|')
-    chunks.append('**Changes in %s:**' % version if version else
-                  '**Changes:**')
-    for i, diff in enumerate(diffs):
-        chunks.append('{{np}}' if i == 0 else '{{nl}}')
-        chunks.append('* %s' % diff)
-    chunks.append(CLOSE_DIV)
-    chunks.append(CLOSE_DIV)
-    return Content(''.join(chunks))
+    header = '**Changes in %s:**' % version if version else '**Changes:**'
+    items = '{{np}}' + '{{nl}}'.join('* %s' % diff for diff in diffs) \
+        if diffs else ''
+    return Content(''.join((OPEN_DIV, '{{div|diffs|', header, items,
+                            CLOSE_DIV, CLOSE_DIV)))
 
 
 def expand_div(classes: str, text: str, **_kwargs) -> Union[str, Content]:
@@ -513,12 +589,19 @@ def expand_empty(style: str, chunks, **_kwargs) -> str:
         capitalize = True
     else:
         so_far = ''.join(chunk for lst in chunks for chunk in lst).strip()
-        capitalize = so_far == '' or re.search(r'[.!?]$', so_far)
+        capitalize = so_far == '' or sentence_end_pattern.search(so_far)
 
     initial = 'A' if capitalize else 'a'
     return '%sn empty string' % initial
 
 
+union_entries_text = 'This object is a member of a union, i.e., it is a ' \
+                     'member of a group of objects of which only one can ' \
+                     'exist at a given time.'
+instance_numbers_text = "This table's Instance Numbers MUST be 1, 2, 3... " \
+                        "(assigned sequentially without gaps)."
+
+
 def expand_entries(*, node, **_kwargs) -> str:
     obj = cast_node(Object, node.parent)
     is_multi, is_fixed, is_union = \
@@ -531,9 +614,7 @@ def expand_entries(*, node, **_kwargs) -> str:
     #     we don't try
     # XXX report.pl has a --showunion option
     if is_union:
-        return 'This object is a member of a union, i.e., it is a member of ' \
-               'a group of objects of which only one can exist at a given ' \
-               'time.'
+        return union_entries_text
 
     # (minEntries, maxEntries) constraints
     label = lambda val: \
@@ -556,8 +637,7 @@ def expand_entries(*, node, **_kwargs) -> str:
     if obj.command_in_path or obj.event_in_path:
         if text != '':
             text += ' '
-        text += "This table's Instance Numbers MUST be 1, 2, 3... " \
-                "(assigned sequentially without gaps)."
+        text += instance_numbers_text
 
     return text
 
@@ -574,7 +654,7 @@ def expand_factory(*, node, **_kwargs) -> Content:
 # noinspection PyShadowingBuiltins
 def expand_gloref(id, **_kwargs) -> str:
     item = find_node(GlossaryItem, id)
-    return '[%s](#%s)' % (item.id, item.anchor)
+    return f'[{item.id}](#{item.anchor})'
 
 
 def expand_hidden(value, **_kwargs) -> Content:
@@ -606,6 +686,17 @@ def expand_issue(descr_or_opts: str, descr: None, **_kwargs) -> str:
 
 # XXX this is a complex function and should be in a separate module
 def expand_keys(node, warning, debug, **_kwargs) -> Content:
+    # describe a unique key, e.g. 'the same values for both {{param|A}} and
+    # {{param|B}}'
+    def describe_key(unique_key) -> str:
+        param_names = [param.ref for param in unique_key.parameters]
+        num_names = len(param_names)
+        intro = 'the same values' if num_names > 1 else 'a given value'
+        quant = 'both ' if num_names == 2 else 'all of ' if num_names > 2 \
+            else ''
+        names = Utility.nicer_list(param_names, r'{{param|\1}}')
+        return f'{intro} for {quant}{names}'
+
     # this can be used within an object that has unique keys...
     parameter = None
     if isinstance(node.parent, Object):
@@ -638,41 +729,53 @@ def expand_keys(node, warning, debug, **_kwargs) -> Content:
     enable_parameter = None if ignore_enable_parameter else \
         obj.enableParameter
 
-    # collect information about the unique keys in a convenient form:
+    # collect information about the unique keys in a convenient form (in a
+    # single pass):
     # 1. collect key information, distinguishing non-functional keys (aren't
     #    affected by enable) and functional keys (are affected by enable)
-    keys = [[], []]
-    for unique_key in unique_keys:
-        functional = unique_key.functional
-        is_conditional = functional and enable_parameter is not None
-        keys[is_conditional].append(unique_key)
-
     # 2. collect non-functional and non-defaulted unique key parameters
+    #    (unconditional keys only)
+    # 3. collect undefined and strong-reference unique key parameters (all
+    #    keys)
+    keys = [[], []]
     num_key_params = 0  # total number of unique key parameters
     non_functional = []  # non-functional unique key parameter names
     non_defaulted = []  # non-defaulted unique key parameter names
-    for unique_key in keys[0]:
+    undefined = []  # undefined unique key parameter names
+    strong_refs = []  # strong-reference unique key parameter names
+    for unique_key in unique_keys:
         functional = unique_key.functional
+        is_conditional = functional and enable_parameter is not None
+        keys[is_conditional].append(unique_key)
         for param_ref in unique_key.parameters:
-            if param_ref.refNode is None:
-                continue
+            param_name = param_ref.ref
             param_ref_node = cast(Parameter, param_ref.refNode)
 
-            if not functional:
-                non_functional.append(param_ref.ref)
+            # XXX refNode returns Null (not None) if not found, so undefined
+            #     parameters are counted here
+            if not is_conditional and param_ref_node is not None:
+                if not functional:
+                    non_functional.append(param_name)
 
-            defaulted = (param_ref_node.syntax.default.type == 'object' and
-                         param_ref_node.syntax.default.status.value !=
-                         'deleted')
-            if not defaulted:
-                non_defaulted.append(param_ref.ref)
+                default = param_ref_node.syntax.default
+                defaulted = (default.type == 'object' and
+                             default.status.value != 'deleted')
+                if not defaulted:
+                    non_defaulted.append(param_name)
 
-            # XXX there's no check for parameters in multiple keys; is this
-            #     permitted?
-            num_key_params += 1
+                # XXX there's no check for parameters in multiple keys; is
+                #     this permitted?
+                num_key_params += 1
 
-    # initialize the returned text
-    text = ''
+            if not param_ref_node:
+                undefined.append(param_name)
+            elif (reference := param_ref_node.syntax.reference) and \
+                    isinstance(reference, PathRef) and \
+                    reference.refType == 'strong':
+                strong_refs.append(param_name)
+
+    # initialize the returned text chunks
+    chunks = []
 
     # XXX some warnings are suppressed if the object has been deleted; this
     #     case should be handled generally and not piecemeal
@@ -684,42 +787,28 @@ def expand_keys(node, warning, debug, **_kwargs) -> Content:
         need_blank_line = False
         if access != 'readOnly' and param_name in non_defaulted:
             if not values_supplied_on_create:
-                text += "The "
+                chunks.append("The ")
             else:
-                text += "If the value isn't assigned by the Controller on " \
-                        "creation, the "
-            text += "Agent MUST choose an initial value that "
+                chunks.append("If the value isn't assigned by the Controller "
+                              "on creation, the ")
+            chunks.append("Agent MUST choose an initial value that ")
             if len(non_defaulted) > 1:
-                text += "(together with %s) " % Utility.nicer_list(
-                        non_defaulted, r'{{param|\1}}', [param_name])
-            text += " doesn't conflict with any existing entries."
+                chunks.append("(together with %s) " % Utility.nicer_list(
+                        non_defaulted, r'{{param|\1}}', [param_name]))
+            chunks.append(" doesn't conflict with any existing entries.")
             need_blank_line = True
 
         # output immutable non-functional key parameter text
         if immutable_non_functional_keys and param_name in non_functional:
             if need_blank_line:
-                text += '{{np}}'
-            text += "This is a non-functional key and its value " \
-                    "MUST NOT change once it's been assigned by the " \
-                    "Controller or set internally by the Agent."
+                chunks.append('{{np}}')
+            chunks.append("This is a non-functional key and its value "
+                          "MUST NOT change once it's been assigned by the "
+                          "Controller or set internally by the Agent.")
 
-        return Content(text)
+        return Content(''.join(chunks))
 
     # the rest of the function applies only to objects (tables)
-    undefined = []
-    strong_refs = []
-    for unique_key in unique_keys:
-        for param_ref in unique_key.parameters:
-            param_name = param_ref.ref
-            if not param_ref.refNode:
-                undefined.append(param_name)
-            else:
-                param_ref_node = cast(Parameter, param_ref.refNode)
-                if (reference := param_ref_node.syntax.reference) and \
-                        isinstance(reference, PathRef) and \
-                        reference.refType == 'strong':
-                    strong_refs.append(param_name)
-
     if undefined and not is_deleted:
         plural = 's' if len(undefined) > 1 else ''
         warning('undefined unique key parameter%s %s' % (
@@ -745,24 +834,12 @@ def expand_keys(node, warning, debug, **_kwargs) -> Content:
         enabled = ' enabled' if is_conditional else ''
         emphasis = ' (regardless of whether or not it is enabled)' if not \
             is_conditional and enable_parameter else ''
-        text += f'At most one{enabled} entry in this table{emphasis} can ' \
-                f'exist with '
-
-        for i, unique_key in enumerate(keys[is_conditional]):
-            param_names = [param.ref for param in unique_key.parameters]
-            if i > 0:
-                text += ', or with '
-            if len(param_names) > 1:
-                text += 'the same values '
-            else:
-                text += 'a given value '
-            text += 'for '
-            if len(param_names) == 2:
-                text += 'both '
-            elif len(param_names) > 2:
-                text += 'all of '
-            text += Utility.nicer_list(param_names, r'{{param|\1}}')
-        text += '.'
+        chunks.append(f'At most one{enabled} entry in this table{emphasis} '
+                      f'can exist with ')
+        chunks.append(', or with '.join(
+                describe_key(unique_key) for unique_key in
+                keys[is_conditional]))
+        chunks.append('.')
 
         # if the unique key is unconditional and includes at least one
         # writable parameter, check whether to output additional text about
@@ -773,14 +850,15 @@ def expand_keys(node, warning, debug, **_kwargs) -> Content:
             #     note that it's CWMP-specific
             # noinspection PyUnreachableCode
             if False:
-                text += ' If the Controller attempts to set the parameters ' \
-                        'of an existing entry such that this requirement ' \
-                        'would be violated, the Agent MUST reject the ' \
-                        'request. In this case, the SetParameterValues ' \
-                        'response MUST include a SetParameterValuesFault ' \
-                        'element for each parameter in the corresponding ' \
-                        'request whose modification would have resulted in ' \
-                        'such a violation.'
+                chunks.append(' If the Controller attempts to set the '
+                              'parameters of an existing entry such that '
+                              'this requirement would be violated, the Agent '
+                              'MUST reject the request. In this case, the '
+                              'SetParameterValues response MUST include a '
+                              'SetParameterValuesFault element for each '
+                              'parameter in the corresponding request whose '
+                              'modification would have resulted in such a '
+                              'violation.')
 
             if num_key_params > 0 and len(non_defaulted) == 0 and not \
                     ignore_enable_parameter:
@@ -788,21 +866,24 @@ def expand_keys(node, warning, debug, **_kwargs) -> Content:
                         'enableParameter')
 
             if len(non_defaulted) > 0:
-                text += ' On creation of a new table entry, the Agent MUST '
+                chunks.append(' On creation of a new table entry, the Agent '
+                              'MUST ')
                 if values_supplied_on_create:
-                    text += '(if not supplied by the Controller on creation) '
+                    chunks.append('(if not supplied by the Controller on '
+                                  'creation) ')
                 if len(non_defaulted) == 1:
-                    text += 'choose an initial value for '
+                    chunks.append('choose an initial value for ')
                 else:
-                    text += 'choose initial values for '
-                text += Utility.nicer_list(non_defaulted, r'{{param|\1}}')
-                text += ' such that the new entry does not conflict with ' \
-                        'any existing entries.'
+                    chunks.append('choose initial values for ')
+                chunks.append(Utility.nicer_list(non_defaulted,
+                                                 r'{{param|\1}}'))
+                chunks.append(' such that the new entry does not conflict '
+                              'with any existing entries.')
 
         if sep_paras:
-            text += '\n'
+            chunks.append('\n')
 
-    return Content(text)
+    return Content(''.join(chunks))
 
 
 def expand_list(arg, *, node: _HasContent, **_kwargs) -> str:
@@ -825,7 +906,7 @@ def expand_mount(*, node, **_kwargs) -> str:
 
 
 def expand_listitem(kind: str, **_kwargs) -> str:
-    return '%s ' % kind
+    return kind + ' '
 
 
 def expand_notify(node, **_kwargs) -> str:
@@ -840,8 +921,9 @@ def expand_notify(node, **_kwargs) -> str:
         text = '' if usp else 'Active Notification MUST by default be ' \
                               'enabled for this parameter.'
     elif notify == 'canDeny':
-        text = 'Value Change' if usp else 'Active'
-        text += ' Notification requests for this parameter MAY be denied.'
+        text = 'Value Change Notification requests for this parameter MAY ' \
+               'be denied.' if usp else 'Active Notification requests for ' \
+                                       'this parameter MAY be denied.'
     return text
 
 
@@ -852,8 +934,11 @@ def expand_null(name: str, scope: str, *, node: _HasContent,
     # XXX name and scope aren't documented in TR-106
     target = parameter
     if name or scope:
-        target = follow_reference(parameter, name, scope=ScopeEnum(scope),
-                                  quiet=MACROS_PATH_QUIET)
+        # (the scope is passed as a string, because ScopeEnum instances
+        # aren't hashable and so can't be cached)
+        target = follow_reference_cached(
+                parameter, name, scope=ScopeEnum(scope).value,
+                quiet=MACROS_PATH_QUIET)
         if not target:
             raise MacroException('non-existent %s' % name)
         if not isinstance(target, Parameter):
@@ -896,8 +981,8 @@ def expand_paramdef(*, node, **_kwargs) -> Content:
     if not parameter.syntax.default or \
             parameter.syntax.default.type != 'parameter':
         raise MacroException('parameter default not specified')
-    return Content('The default value MUST be %s.' %
-                   maybe_empty(parameter.syntax.default.value))
+    default = maybe_empty(parameter.syntax.default.value)
+    return Content(f'The default value MUST be {default}.')
 
 
 def expand_profdesc(*, node: _HasContent, **_kwargs) -> Content:
@@ -910,16 +995,18 @@ def expand_profdesc(*, node: _HasContent, **_kwargs) -> Content:
 
     intro = "{{profile}} profile for the *%s* data model" % model
     if not extends:
-        text = 'This table defines the %s. ' % intro
+        first = f'This table defines the {intro}. '
     else:
-        text = 'The %s is defined as the union of the %s profile%s and the ' \
-               'additional requirements defined in this table. ' % (
-                intro, ', '.join('{{profile|%s}}' % prof for prof in extends),
-                's' if len(extends) > 1 else '')
-    text += 'The minimum REQUIRED version for this profile is %s:%s.' % \
-            (re.sub(r':.*', '', model.name), version)
+        profiles = ', '.join('{{profile|%s}}' % prof for prof in extends)
+        plural = 's' if len(extends) > 1 else ''
+        first = f'The {intro} is defined as the union of the {profiles} ' \
+                f'profile{plural} and the additional requirements defined ' \
+                f'in this table. '
+    model_name = model_version_pattern.sub('', model.name)
+    second = f'The minimum REQUIRED version for this profile is ' \
+             f'{model_name}:{version}.'
 
-    return Content(text)
+    return Content(first + second)
 
 
 def expand_profile(ref: str, *, node: _HasContent, **_kwargs) -> str:
@@ -940,7 +1027,8 @@ def expand_profile(ref: str, *, node: _HasContent, **_kwargs) -> str:
 # XXX this is a complex function and should be in a separate module
 def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
     parameter = cast_node(Parameter, node.parent)
-    reference = parameter.syntax.reference
+    syntax = parameter.syntax
+    reference = syntax.reference
     if not reference:
         raise MacroException('parameter is not a reference')
 
@@ -964,14 +1052,15 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
             delete = True
         elif opt == 'ignore':
             ignore = True
-        elif re.match('^(deprecated|obsoleted|deleted)$', opt):
+        elif opt in status_options:
             status = opt
         else:
             raise MacroException('invalid option %s' % opt)
 
     # it's assumed that this text will be generated after {{list}} (if present)
     # (this is guaranteed to be the case if they're auto-inserted)
-    text = 'The value ' if not parameter.syntax.list else 'Each list item '
+    is_list = bool(syntax.list)
+    chunks = ['Each list item ' if is_list else 'The value ']
 
     # path references
     if isinstance(reference, PathRef):
@@ -985,59 +1074,60 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
         # see earlier explanation of how status and scope interact
         scope = status or target_parent_scope
 
-        # check for spurious trailing "{i}." when targetType is "row" (this is
-        # a common error)
-        if target_type == 'row' and \
-                any(tp.endswith('{i}.') for tp in target_parents):
+        # in a single pass over the targetParents and their nodes:
+        # - check for spurious trailing "{i}." when targetType is "row" (this
+        #   is a common error)
+        # - report non-existent targetParents nodes (these are Null) (unless
+        #   ignoring them), but ignore all targets starting with '.Services.'
+        #   because these are in different data models
+        # - determine whether the target parent is fixed; it's only regarded
+        #   as being fixed if all the good target parents are fixed objects
+        # XXX should check that all target_parents_good are objects?
+        target_parents_bad = []  # bad targetParents (not their nodes)
+        target_parents_good = []  # good targetParents (not their nodes)
+        target_parent_fixed = True
+        trailing_i = False
+        for target, parent in zip(target_parents, target_parents_nodes):
+            if not trailing_i and target.endswith('{i}.'):
+                trailing_i = True
+            if parent is not Null:
+                target_parents_good.append(target)
+                if target_parent_fixed and not parent.dmr_fixedObject:
+                    target_parent_fixed = False
+            elif not target.startswith('.Services.'):
+                target_parents_bad.append(target)
+        if target_type == 'row' and trailing_i:
             warning('trailing "{i}." ignored in targetParent %s (targetType '
                     '"%s")' % (target_parents, target_type))
-
-        # this is a tuple of (targetParent, node) tuples, with node=Null for
-        # any non-existent nodes
-        target_parents_tuple = tuple(zip(target_parents, target_parents_nodes))
-
-        # report non-existent targetParents nodes (unless ignoring them), but
-        # ignore all targets starting with '.Services.' because these are in
-        # different data models
-        target_parents_bad = [(target, parent) for target, parent in
-                              target_parents_tuple if (
-                                      parent is Null and not
-                              target.startswith('.Services.'))]
         if not ignore and target_parents_bad:
             plural = 's' if len(target_parents_bad) > 1 else ''
             warning('non-existent targetParent%s %s' % (
-                plural, Utility.nicer_list(
-                        [target for target, _ in target_parents_bad])))
+                plural, Utility.nicer_list(target_parents_bad)))
 
         # if some targetParents items were specified but none exist, this is
         # a special case and the parameter value always has to be empty
-        # XXX should check that all target_parents_good are objects?
-        target_parents_good = [(target, parent) for target, parent in
-                               target_parents_tuple if parent is not Null]
         if target_parents and not target_parents_good:
-            text = 'None of the possible target objects exist in this data ' \
-                   'model, so the parameter value MUST be {{empty}}.'
-            return Content(text)
+            return Content('None of the possible target objects exist in '
+                           'this data model, so the parameter value MUST be '
+                           '{{empty}}.')
 
-        # determine whether the target parent is fixed; it's only regarded as
-        # being fixed if all the good target parents are fixed objects
-        target_parent_fixed = all(parent.dmr_fixedObject for _, parent in
-                                  target_parents_good)
+        # format the good targetParents (used in both the row and non-row
+        # cases below)
+        targets_text = Utility.nicer_list(
+                target_parents_good, r'{{object|\1|%s}}' % scope,
+                last='or') if target_parents_good else ''
 
         # add the next section of text
-        text += 'MUST be the Path Name of '
+        chunks.append('MUST be the Path Name of ')
 
         if target_type == 'row':
             if arg:
-                text += arg
+                chunks.append(arg)
             elif not target_parents_good:
-                text += 'a table row'
+                chunks.append('a table row')
             else:
-                targets = [target for target, _ in target_parents_good]
                 plural = 's' if len(target_parents_good) > 1 else ''
-                text += 'a row in the %s table%s' % (
-                    Utility.nicer_list(targets, r'{{object|\1|%s}}' % scope,
-                                       last='or'), plural)
+                chunks.append(f'a row in the {targets_text} table{plural}')
 
         else:
             target_type = target_type.replace(
@@ -1045,44 +1135,44 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
             target_type = target_type.replace('any', 'parameter or object')
 
             if arg:
-                text += arg
+                chunks.append(arg)
             else:
                 if target_data_type != 'any':
-                    text += 'an ' if re.match(r'^[aeiou]',
-                                              target_data_type) else 'a '
-                    text += target_data_type
+                    chunks.append('an ' if vowel_pattern.match(
+                            target_data_type) else 'a ')
+                    chunks.append(target_data_type)
                 else:
-                    text += 'an ' if re.match(r'^[aeiou]',
-                                              target_type) else 'a '
-                    text += target_type
+                    chunks.append('an ' if vowel_pattern.match(
+                            target_type) else 'a ')
+                    chunks.append(target_type)
 
             if target_parents_good:
-                targets = [target for target, _ in target_parents_good]
-                text += ', which MUST be a child of %s' % \
-                    Utility.nicer_list(targets, r'{{object|\1|%s}}' % scope,
-                                       last='or')
+                chunks.append(f', which MUST be a child of {targets_text}')
 
         if path_ref.refType == 'strong':
             target_type = target_type.replace('row', 'object')
-            target_type = re.sub(r'single.*', 'object', target_type)
+            target_type = single_pattern.sub('object', target_type)
             target_type = target_type.replace('parameter or object', 'item')
             if target_parent_fixed:
-                if parameter.syntax.list:
-                    text += ', or {{empty}}'
+                if is_list:
+                    chunks.append(', or {{empty}}')
             elif not (path_ref.command_in_path or path_ref.event_in_path):
-                text += '. If the referenced %s is deleted, ' % target_type
+                chunks.append(f'. If the referenced {target_type} is '
+                              f'deleted, ')
                 if delete:
-                    text += 'this instance MUST also be deleted (so the ' \
-                            'parameter value will never be {{empty}})'
+                    chunks.append('this instance MUST also be deleted (so '
+                                  'the parameter value will never be '
+                                  '{{empty}})')
                 else:
-                    text += 'the '
-                    if parameter.syntax.list:
-                        text += 'corresponding item MUST be removed from ' \
-                                'the list'
+                    chunks.append('the ')
+                    if is_list:
+                        chunks.append('corresponding item MUST be removed '
+                                      'from the list')
                     else:
-                        text += 'parameter value MUST be set to {{empty}}'
+                        chunks.append('parameter value MUST be set to '
+                                      '{{empty}}')
 
-        text += '.'
+        chunks.append('.')
 
     # instance references
     # XXX these are no longer used? this code is untested
@@ -1093,24 +1183,26 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
 
         scope = status or target_parent_scope
 
-        text += 'MUST be the instance number of a row in the ' \
-                '{{object|%s|%s}} table' % (target_parent, scope)
+        chunks.append('MUST be the instance number of a row in the '
+                      '{{object|%s|%s}} table' % (target_parent, scope))
         # XXX pathRef has no equivalent of the following text
-        if not (delete or parameter.syntax.list):
-            text += ', or else be {{null}} if no row is currently referenced'
-        text += '.'
+        if not (delete or is_list):
+            chunks.append(', or else be {{null}} if no row is currently '
+                          'referenced')
+        chunks.append('.')
 
         if instance_ref.refType == 'strong':
-            text += ' If the referenced row is deleted, '
+            chunks.append(' If the referenced row is deleted, ')
             if delete:
-                text += 'this instance MUST also be deleted (so the ' \
-                        'parameter value will never be {{null}}).'
+                chunks.append('this instance MUST also be deleted (so the '
+                              'parameter value will never be {{null}}).')
             else:
-                if parameter.syntax.list:
-                    text += 'the corresponding item MUST be removed from ' \
-                            'the list.'
+                if is_list:
+                    chunks.append('the corresponding item MUST be removed '
+                                  'from the list.')
                 else:
-                    text += 'the parameter value MUST be set to {{null}}.'
+                    chunks.append('the parameter value MUST be set to '
+                                  '{{null}}.')
 
     # enumeration references
     elif isinstance(reference, EnumerationRef):
@@ -1130,22 +1222,22 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
             debug("targetParam %s doesn't define any enumeration values" %
                   target_param)
 
-        text += 'MUST be a member of the list reported by the ' \
-                '{{param|%s|%s}} parameter' % (target_param, scope)
+        chunks.append('MUST be a member of the list reported by the '
+                      '{{param|%s|%s}} parameter' % (target_param, scope))
 
         if null_value is not None:
             if null_value == '':
                 null_value = '{{empty}}'
-            text += ', or else be %s' % null_value
+            chunks.append(f', or else be {null_value}')
 
-        text += '.'
+        chunks.append('.')
 
     # unexpected / unsupported reference type
     else:
         raise MacroException('unsupported reference type %s' %
                              reference.typename)
 
-    return Content(text)
+    return Content(''.join(chunks))
 
 
 # XXX experimental (ignore the old text when within one of these macros)
@@ -1155,8 +1247,9 @@ def expand_reference(arg, opts, *, node, warning, debug, **_kwargs):
 #     which would (currently) become {{replaced|\{\{param\|A\}\}|{{param|B}}}},
 #     but this is rather complicated
 # XXX should handle removed, inserted and replaced in a single function
-ignore_old_macros = {'object', 'param', 'command', 'event', 'enum', 'bibref',
-                     'deprecated', 'obsoleted', 'deleted'}
+ignore_old_macros = frozenset({'object', 'param', 'command', 'event', 'enum',
+                               'bibref', 'deprecated', 'obsoleted',
+                               'deleted'})
 
 
 def removed_or_inserted(what: str, text: str) -> str:
@@ -1191,7 +1284,7 @@ def removed_or_inserted(what: str, text: str) -> str:
 
 def expand_removed(text: str, info, stack, **_kwargs) -> str:
     # XXX experimental (see above)
-    if {ref.name for ref in stack} & ignore_old_macros:
+    if any(ref.name in ignore_old_macros for ref in stack):
         info('ignored removed text %r within macro argument' % text)
         return ''
     return removed_or_inserted('removed', Macro.unescape(text))
@@ -1264,27 +1357,25 @@ def expand_status(version, reason, *, node, stack, info, warning,
                     '%r' % (macro.name, trailing))
 
     # generate the text
-    text = 'This %s was %s in %s' % (
-        node.parent.elemname, macro.name.upper(), version)
+    chunks = [f'This {node.parent.elemname} was {macro.name.upper()} in '
+              f'{version}']
 
     # append the reason, if supplied
     if reason:
         # the reason shouldn't end with a period (or exclamation mark or
         # question mark)
-        if match := re.search(r'([.!?])$', reason):
-            term = match.group(1)
+        if match := sentence_end_pattern.search(reason):
+            term = match.group(0)
             info('{{%s}} reason should be a fragment but ends with %r' % (
                 macro.name, term))
             reason = reason[:-1]
-        text += '{{span|{{classes}}| %s}}' % reason
+        chunks.append('{{span|{{classes}}| %s}}' % reason)
 
-    # terminate the sentence
-    text += '.'
+    # terminate the sentence, and append an empty span (it can be useful as
+    # a marker)
+    chunks.append('.{{span|{{classes}}}}')
 
-    # this is an empty span (it can be useful as a marker)
-    text += '{{span|{{classes}}}}'
-
-    return Content(text)
+    return Content(''.join(chunks))
 
 
 # noinspection PyShadowingBuiltins
@@ -1295,9 +1386,14 @@ def expand_template(id, **_kwargs) -> Content:
 
 # convert the TR-nnniiaacc form to tr-nnn-i-a-c (because it's documented)
 def expand_trname(name, **_kwargs) -> str:
+    return format_trname(name)
+
+
+# the same few TR names are referenced many times, so cache the results
+@cache
+def format_trname(name: str) -> str:
     text = name
-    if match := re.match(
-            r'^(TR)-(\d+)(?:i(\d+))?(?:a(\d+))?(?:c(\d+))?$', name):
+    if match := trname_pattern.match(name):
         tr, nnn, i, a, c = match.groups()
         tr = tr.lower()
         nnn = int(nnn)
@@ -1316,9 +1412,10 @@ def expand_union(node: _HasContent, **_kwargs) -> Content:
             raise MacroException('only valid in discriminator parameters')
         # XXX should use Utility.nicer_list() but it needs to support \1 and \2
         #     (actually it would be better to use %s instead)
-        object_refs = ', '.join(
+        # (str.join() builds a list anyway, so pass it one)
+        object_refs = ', '.join([
                 '{{object|%s|%s}}' % (obj.h_nameonly, obj.status) for obj
-                in objects)
+                in objects])
         text = 'This parameter discriminates between the %s union objects.' \
                % object_refs
 
@@ -1356,24 +1453,39 @@ def expand_units(*, node, **_kwargs) -> str:
     return "*%s*" % units.value
 
 
+# return (up to) the last size characters of the text in a list of lists
+# of chunks, without joining them all
+def text_tail(chunks: list[list[str]], size: int) -> str:
+    tail = ''
+    for lst in reversed(chunks):
+        for chunk in reversed(lst):
+            tail = chunk[-size:] + tail
+            if len(tail) >= size:
+                return tail[-size:]
+    return tail
+
+
+# desired replacement text for the various whitespace macros
+whitespace_macro_text = {'ns': ' ', 'nl': '\n', 'np': '\n\n'}
+
+
 # these macros only insert whitespace if the current string doesn't already
 # end with the desired replacement text
 def expand_whitespace(stack, chunks, **_kwargs) -> str:
-    # desired replacement text for the various whitespace macros
-    macro_text = {'ns': ' ', 'nl': '\n', 'np': '\n\n'}
-
     # check that the macro name is expected
     name = stack[-1].name
-    assert name in macro_text, 'invalid whitespace macro name %s (not %s)' % (
-        name, ', '.join(macro_text))
+    assert name in whitespace_macro_text, \
+        'invalid whitespace macro name %s (not %s)' % (
+            name, ', '.join(whitespace_macro_text))
 
     # desired replacement text
-    text = macro_text[name]
+    text = whitespace_macro_text[name]
 
-    # collect the text that's been added so far
+    # collect the tail of the text that's been added so far (only the last
+    # two characters are needed)
     # XXX it would be nice to have a more direct way of doing this; maybe
     #     should maintain it in parallel with chunks
-    so_far = ''.join(chunk for lst in chunks for chunk in lst)
+    so_far = text_tail(chunks, 2)
 
     if so_far == '':
         # nothing there yet; don't add anything
@@ -191,6 +191,10 @@ pluralize = Utility.pluralize
 PATH_QUIET = True
 
 
+# type names are requested for every node (e.g. by formats, for every row or
+# element), so cache them; this also means that all nodes of the same type
+# share the same type name string
+@cache
 def typename(cls: NodeOrMixinType, *, lower: bool = False) -> str:
     name = cls.__name__
     if name.startswith('_'):
@@ -1165,7 +1169,7 @@ class _Base0(_Node):
     def unhide(self, *, description: bool = False,
                upwards: bool = False) -> None:
         self.is_hidden = False
-        if description and hasattr(self, 'description'):
+        if description and isinstance(self, _HasDescription):
             self.description.unhide()
 
         if not upwards:
@@ -1182,7 +1186,7 @@ class _Base0(_Node):
     def h_unhide(self, *, description: bool = False,
                  upwards: bool = False) -> None:
         self.is_hidden = False
-        if description and hasattr(self, 'description'):
+        if description and isinstance(self, _HasDescription):
             self.description.unhide()
 
         if not upwards:
@@ -50,7 +50,11 @@ README."""
 # XXX for now, these instructions must be manually copied into PROJECT.yaml
 #     (not really a problem, because use of pandoc is only temporary)
 def instructions() -> str:
-    return '''
+    return INSTRUCTIONS
+
+
+# the leading and trailing newlines are removed once, at import time
+INSTRUCTIONS = '''
 The report tool doesn't yet generate HTML directly. To generate HTML, use the
 `markdown` format to generate markdown, and then run [pandoc] to generate HTML.
 
@@ -73,6 +73,11 @@ class Plugin:
         """Import all plugins from the current directory (unless suppressed
         via ``nocurdir``) and the supplied plugin directories.
 
+        Plugins are never imported implicitly (e.g., when the package is
+        imported); this method has to be called explicitly. ``report.py``
+        calls it after parsing the core command-line arguments, because
+        plugins can add their own arguments.
+
         Args:
             plugindirs: The plugin directories.
             nocurdir: Whether not to search the current directory.
@@ -1,61 +1,97 @@
 import csv
+import io
 
-columns = {
-    'Name': lambda item: item.name,
-    'Type': lambda item: (item.syntax.primitive_inherited
-                          if item.typename == 'parameter' else item.typename),
-    'Write': lambda item: access_string(getattr(item, 'access', '')),
-    'Description': lambda item: (
-            item.description.content.markdown.strip() or ''),
-    'Object Default': lambda item: (
-        item.syntax.default.value if item.typename == 'parameter' and
-        item.syntax.default.type == 'object' else ''),
-    'Version': lambda item: item.version_inherited
-}
+headers = ('Name', 'Type', 'Write', 'Description', 'Object Default',
+           'Version')
 
-writer = None
+access_map = {'readOnly': 'R', 'writeOnceReadOnly': 'WO', 'readWrite': 'W',
+              '': ''}
+
+# output buffer size (args.output is wrapped with a buffer of this size, if
+# possible)
+output_buffer_size = 1 << 18
+
+# the items are collected while visiting, and their rows are extracted and
+# written by _end_(); these are (extract function, item) tuples
+items = []
 
 
 def access_string(access):
-    access_map = {'readOnly': 'R', 'writeOnceReadOnly': 'WO',
-                  'readWrite': 'W', '': ''}
     value = access.value if access is not None else ''
     assert value in access_map, 'unsupported access %s' % value
     return access_map[value]
 
 
+# extract a row's values (in header order) from a model item; the attribute
+# chains are only traversed once
+def extract_row(item):
+    typename = item.typename
+    if typename == 'parameter':
+        syntax = item.syntax
+        default = syntax.default
+        type_ = syntax.primitive_inherited
+        object_default = default.value if default.type == 'object' else ''
+    else:
+        type_ = typename
+        object_default = ''
+    return (item.name, type_, access_string(getattr(item, 'access', '')),
+            item.description.content.markdown.strip() or '', object_default,
+            item.version_inherited)
+
+
+# extract a row's values from an arguments item; the Write and Object
+# Default columns are empty
+def extract_arguments_row(item):
+    return (item.keylast, item.typename, '', '%s arguments.' % item.keylast,
+            '', item.version_inherited)
+
+
+def _add_arguments_(arg_parser):
+    default_dialect = 'excel'
+
+    arg_group = arg_parser.add_argument_group('csv report format arguments')
+    arg_group.add_argument('--csv-dialect', choices=csv.list_dialects(),
+                           default=default_dialect,
+                           help='CSV dialect, e.g. %r uses \\n line endings '
+                                'and quotes all fields; default: %r' % (
+                                    'unix', default_dialect))
+    return arg_group
+
+
 def _begin_(_, args):
-    global writer
-    writer = csv.DictWriter(args.output, fieldnames=columns.keys())
-    writer.writeheader()
+    items.clear()
+
+
+def _end_(_, args):
+    # the wrappers (if any) are always detached (which flushes them), so
+    # args.output isn't closed when they're garbage collected
+    output = args.output
+    wrapped = hasattr(output, 'buffer')
+    if wrapped:
+        output.flush()
+        output = io.TextIOWrapper(
+                io.BufferedWriter(output.buffer,
+                                  buffer_size=output_buffer_size),
+                encoding=args.output.encoding, errors=args.output.errors,
+                newline='')
+    try:
+        writer = csv.writer(output, dialect=args.csv_dialect)
+        writer.writerow(headers)
+        writer.writerows(extract(item) for extract, item in items)
+    finally:
+        items.clear()
+        if wrapped:
+            output.detach().detach()
+    args.output.flush()
 
 
 # these are Model, Object, Parameter etc. instances
 # noinspection PyUnresolvedReferences
 def visit__model_item(item):
-    assert writer is not None
-    writer.writerow({key: func(item) for key, func in columns.items()})
-
-
-# alternative; visit__model_item() will be called too (is this wrong?)
-# noinspection PyUnresolvedReferences,PyUnusedLocal
-def visit_parameter(param):
-    # noinspection PyUnreachableCode
-    assert writer is not None
-    writer.writerow(
-            {'Name': param.name,
-             'Type': param.syntax.primitive_inherited,
-             'Write': access_string(param.access),
-             'Description': param.description.content.markdown.strip() or '',
-             'Object Default': (param.syntax.default.value if
-                                param.syntax.default.type == 'object' else ''),
-             'Version': param.version_inherited})
+    items.append((extract_row, item))
 
 
 # these are Input and Output, which aren't _ModelItem instances
 # noinspection PyUnresolvedReferences
 def visit__arguments(item):
-    assert writer is not None
-    writer.writerow({'Name': item.keylast, 'Type': item.typename,
-                     'Description': '%s arguments.' % item.keylast,
-                     'Version': item.version_inherited})
+    items.append((extract_arguments_row, item))
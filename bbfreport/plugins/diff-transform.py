@@ -61,8 +61,8 @@ Diffs = dict[Union[_ModelItem, _ValueFacet], list['Diff']]
 
 # XXX need to optimize h_elems, which calls h_objects, which calls
 #     objpath; h_elems is only needed to associate object addition and
-#     deletion with the correct parent; everything is much better if
-#     _path_split is cached
+#     deletion with the correct parent; _path_split and fullpath (and
+#     therefore objpath) are cached, which helps a lot
 time_it = False
 
 
@@ -82,7 +82,9 @@ class Operation(Enum):
 # XXX in general should make more use of dataclasses
 # XXX note that defining them as nested classes is VERY slow
 # XXX there should also be a Diffs class
-@dataclass
+# XXX python 3.10 @dataclass(slots=True) (there are lots of these, so slots
+#     save memory and speed up attribute access)
+@dataclass(**({'slots': True} if sys.version_info >= (3, 10) else {}))
 class Diff:
     old_node: Node
     new_node: Node
@@ -99,18 +101,42 @@ class Diff:
     def append(diffs: Diffs, old_node: Node, new_node: Node, entity: Entity,
                operation: Operation, *, name: Optional[str] = None,
                value: Optional[Any] = None, value2: Optional[Any] = None,
-               elem: Optional[Node] = None,
-               is_whitespace: bool = False) -> None:
-        # we refer to it as a model item, but in fact it can be either a model
-        # item (object, parameter, command, event, ...) or a value facet
-        # (enumeration, pattern), all of which have descriptions
-        model_item_node = \
-            new_node.instance_in_path((_ModelItem, _ValueFacet)) or new_node
-        diffs.setdefault(model_item_node, []).append(
+               elem: Optional[Node] = None, is_whitespace: bool = False,
+               model_item_nodes: Optional[dict[Node, Node]] = None) -> None:
+        diffs.setdefault(Diff.model_item_node(
+                new_node, model_item_nodes=model_item_nodes), []).append(
                 Diff(old_node, new_node, entity, operation, name=name,
                      value=value, value2=value2, elem=elem,
                      is_whitespace=is_whitespace))
 
+    # this is more efficient than calling append() for each diff (all the
+    # diffs must have the same new node)
+    @staticmethod
+    def extend(diffs: Diffs, new_node: Node, new_diffs: list['Diff'], *,
+               model_item_nodes: Optional[dict[Node, Node]] = None) -> None:
+        if new_diffs:
+            diffs.setdefault(Diff.model_item_node(
+                    new_node, model_item_nodes=model_item_nodes), []).extend(
+                    new_diffs)
+
+    # we refer to it as a model item, but in fact it can be either a model
+    # item (object, parameter, command, event, ...) or a value facet
+    # (enumeration, pattern), all of which have descriptions; the results
+    # can be cached in model_item_nodes (for the duration of the diff pass),
+    # because there are often many diffs for the same node
+    @staticmethod
+    def model_item_node(new_node: Node, *,
+                        model_item_nodes: Optional[dict[Node, Node]] = None
+                        ) -> Node:
+        if model_item_nodes is not None and \
+                (model_item_node := model_item_nodes.get(new_node)):
+            return model_item_node
+        model_item_node = new_node.instance_in_path(
+                (_ModelItem, _ValueFacet)) or new_node
+        if model_item_nodes is not None:
+            model_item_nodes[new_node] = model_item_node
+        return model_item_node
+
     def __str__(self):
         name = self.name if self.name else self.elem.typename if self.elem \
             else self.entity.name
@@ -177,7 +203,8 @@ def visit(root: Root, args, logger) -> Optional[bool]:
     logger.info('comparing %s and %s' % (
         key_str(models[0]), key_str(models[1])))
     start = time.time()
-    diffs = node_diffs(models[0], models[1], logger=logger)
+    diffs = node_diffs(models[0], models[1], model_item_nodes={},
+                       logger=logger)
     logger.info('compared %s and %s in %d ms' % (
         key_str(models[0]), key_str(models[1]), (time.time() - start) * 1000))
 
@@ -201,12 +228,25 @@ def visit(root: Root, args, logger) -> Optional[bool]:
 
     def elem_typ(nod: Node) -> str:
         # omitting 'dataTypeRef' is cosmetic
-        return {'dataTypeRef': ''}.get(nod.typename, nod.typename)
+        return '' if (typename := nod.typename) == 'dataTypeRef' else typename
+
+    # str(node) calls format(), which isn't cheap, and the same nodes recur
+    # across a model item's diffs; the cache is cleared for each model item
+    # because its {{diffs}} footer (which changes str(description)) is added
+    # after its diffs have been processed
+    node_strs = {}
+
+    def node_str(nod: Node) -> str:
+        if (val := node_strs.get(nod)) is None:
+            val = node_strs[nod] = str(nod)
+        return val
+
+    absolute_scope = ScopeEnum('absolute')
 
     def elem_str(nod: Node) -> str:
         return relative_path(nod.objpath, new_node.objpath,
-                             scope=ScopeEnum('absolute')) \
-            if isinstance(nod, _ModelItem) else val if (val := str(nod)) \
+                             scope=absolute_scope) \
+            if isinstance(nod, _ModelItem) else val if (val := node_str(nod)) \
             else ''
 
     def elem_ref(nod: Node) -> str:
@@ -227,16 +267,16 @@ def visit(root: Root, args, logger) -> Optional[bool]:
     # XXX and content changes
     counts = {}
     for model_item, model_item_diffs in diffs.items():
-        str_model_item = str(model_item)
+        node_strs.clear()
+        str_model_item = node_str(model_item)
         macro_args = []
         body = []
         new_node = None
         new_body = None
         j = 0
-        any_attr_diff = any(d.entity == Entity.attr for d in model_item_diffs)
-        any_elem_diff = any(d.entity == Entity.elem for d in model_item_diffs)
-        any_cont_diff = any(d.entity == Entity.content
-                            and not d.is_whitespace for d in model_item_diffs)
+        # any attr or elem diff, or any non-whitespace content diff
+        any_diff = any(d.entity != Entity.content or not d.is_whitespace
+                       for d in model_item_diffs)
         for model_item_diff in model_item_diffs:
             old_node, new_node, entity, operation, name, value, value2 = (
                 model_item_diff.old_node, model_item_diff.new_node,
@@ -246,13 +286,13 @@ def visit(root: Root, args, logger) -> Optional[bool]:
 
             # these are used for various tests and messages
             node = old_node if operation == Operation.removed else new_node
-            str_node = str(node)
+            str_node = node_str(node)
 
             # ignore some data type changes; this is primarily intended to
             # ignore Alias -> _AliasUSP changes (and currently these are the
             # only changes that it catches)
             if isinstance(old_node, DataTypeRef) and \
-                    str(new_node) == str(old_node) and \
+                    node_str(new_node) == node_str(old_node) and \
                     new_node.base != old_node.base:
                 logger.info('%s: ignored %s %s -> %s change' % (
                     node.nicepath, node.typename, old_node.base,
@@ -284,7 +324,7 @@ def visit(root: Root, args, logger) -> Optional[bool]:
 
             # unhide the changed node and its ancestors (and their
             # description elements)
-            if any_attr_diff or any_elem_diff or any_cont_diff:
+            if any_diff:
                 new_node.h_unhide(description=True, upwards=True)
                 # logger.debug('%s %s (and up) unhidden' % (
                 #     new_node.nicepath, new_node.typename))
@@ -355,8 +395,9 @@ def visit(root: Root, args, logger) -> Optional[bool]:
                 if j1 > j:
                     body.extend(new_body[j:j1])
 
-                # escape special characters in 'old'
-                old = ''.join(Macro.escape(str(s)) for s in old_body[i1:i2])
+                # escape special characters in 'old' (escaping is per
+                # character, so it can be done after joining)
+                old = Macro.escape(''.join(str(s) for s in old_body[i1:i2]))
                 new = ''.join(str(s) for s in new_body[j1:j2])
                 if tag == 'replace':
                     # XXX this can cause problems when old closes a macro and
@@ -410,11 +451,25 @@ def visit(root: Root, args, logger) -> Optional[bool]:
 # XXX I'm not sure whether or not to include 'functional' here
 # XXX it would be better not to ignore them, but not always to report them
 # XXX profiles are complicated, so ignore them for now
-ignored_attrnames = {'action', 'activeNotify', 'dmr_previousParameter',
-                     'dmr_previousObject', 'dmr_previousCommand',
-                     'dmr_previousEvent', 'dmr_previousProfile', 'dmr_version',
-                     'functional', 'targetParent', 'version'}
-ignored_typenames = {'componentRef', 'profile'}
+ignored_attrnames = frozenset({
+    'action', 'activeNotify', 'dmr_previousParameter', 'dmr_previousObject',
+    'dmr_previousCommand', 'dmr_previousEvent', 'dmr_previousProfile',
+    'dmr_version', 'functional', 'targetParent', 'version'})
+ignored_typenames = frozenset({'componentRef', 'profile'})
+
+
+# content body items that are treated as whitespace when checking for
+# whitespace-only changes
+def is_space_item(item: Any) -> bool:
+    return isinstance(item, str) and (not item or item.isspace())
+
+
+# content body chunks (as strings) that are treated as whitespace when
+# checking for whitespace-only changes
+# XXX should generalize para_sep_chunk to check for any 'close then open'
+#     within a chunk, because this is harder to handle
+para_sep_chunk = '[close(div), open(div), call(classes), argsep(|)]'
+space_chunks = frozenset({"[' ']", "'\n\n'" '[call(nl)]', '[call(np)]'})
 
 
 # XXX this should be a _Node method and should use comparison operators, where
@@ -422,57 +477,96 @@ ignored_typenames = {'componentRef', 'profile'}
 #     same as a, b is an invalid extension of a); there should also be
 #     functional versions of the comparison operators that return the diffs)
 def node_diffs(old_node: Node, new_node: Node, *,
-               diffs: Optional[Diffs] = None, logger, level: int = 0) -> Any:
+               diffs: Optional[Diffs] = None,
+               fingerprints: Optional[dict[Node, Optional[tuple]]] = None,
+               model_item_nodes: Optional[dict[Node, Node]] = None,
+               logger, level: int = 0) -> Any:
     if diffs is None:
         diffs = {}
+    if fingerprints is None:
+        fingerprints = {}
+    if model_item_nodes is None:
+        model_item_nodes = {}
 
     # sanity check
     assert type(old_node) is type(new_node)
 
+    # most subtrees are unchanged, so don't bother comparing them in detail
+    # (None means that the subtree has to be compared in detail)
+    if (fingerprint := node_fingerprint(
+            old_node, fingerprints=fingerprints)) is not None and \
+            fingerprint == node_fingerprint(new_node,
+                                            fingerprints=fingerprints):
+        return diffs
+
     # attributes have names, so it's easy to tell what's been added etc.
-    attrs_changed = {name: (value, new_node.attrs[name]) for name, value in
-                     old_node.attrs.items() if name not in ignored_attrnames
-                     and name in new_node.attrs
-                     and new_node.attrs[name] != value}
-    attrs_removed = {name: value for name, value in old_node.attrs.items()
-                     if name not in ignored_attrnames
-                     and name not in new_node.attrs}
-    attrs_added = {name: value for name, value in new_node.attrs.items()
-                   if name not in ignored_attrnames
-                   and name not in old_node.attrs}
-
-    if attrs_changed:
-        for name, (old_, new_) in attrs_changed.items():
-            Diff.append(diffs, old_node, new_node, Entity.attr,
-                        Operation.changed, name=name, value=old_, value2=new_)
-    if attrs_removed:
-        for name, value in attrs_removed.items():
-            Diff.append(diffs, old_node, new_node, Entity.attr,
-                        Operation.removed, name=name, value=value)
-    if attrs_added:
-        for name, value in attrs_added.items():
+    # (each attrs access builds a new dictionary, so only do it once; the
+    # set operations are only used to check whether there's anything to do,
+    # because the diffs have to be in attribute definition order)
+    old_attrs, new_attrs = old_node.attrs, new_node.attrs
+    for name, value in old_attrs.items():
+        if name not in ignored_attrnames and name in new_attrs and \
+                (value2 := new_attrs[name]) != value:
             Diff.append(diffs, old_node, new_node, Entity.attr,
-                        Operation.added, name=name, value=value)
+                        Operation.changed, name=name, value=value,
+                        value2=value2, model_item_nodes=model_item_nodes)
+    if names := old_attrs.keys() - new_attrs.keys() - ignored_attrnames:
+        for name, value in old_attrs.items():
+            if name in names:
+                Diff.append(diffs, old_node, new_node, Entity.attr,
+                            Operation.removed, name=name, value=value,
+                            model_item_nodes=model_item_nodes)
+    if names := new_attrs.keys() - old_attrs.keys() - ignored_attrnames:
+        for name, value in new_attrs.items():
+            if name in names:
+                Diff.append(diffs, old_node, new_node, Entity.attr,
+                            Operation.added, name=name, value=value,
+                            model_item_nodes=model_item_nodes)
 
     # elements are a bit harder (it depends on whether they're keyed)
+
+    # index the new node's elements (in order) by typename, and the keyed
+    # ones also by typename and key suffix; unkeyed elements match any old
+    # element of the same type
+    # XXX new_node won't contain an item with the same key; need to know
+    #     how many components to ignore; for now, assume 1 (the name of
+    #     the file that defined the model; see node.py Model._calckey())
+    new_elems = new_node.h_elems
+    typename_index: dict[str, list[Node]] = {}
+    unkeyed_index: dict[str, list[tuple[int, Node]]] = {}
+    keyed_index: dict[tuple[str, Any], list[tuple[int, Node]]] = {}
+    for index, elem2 in enumerate(new_elems):
+        typename = elem2.typename
+        if typename in ignored_typenames:
+            continue
+        typename_index.setdefault(typename, []).append(elem2)
+        if not elem2.key:
+            unkeyed_index.setdefault(typename, []).append((index, elem2))
+        else:
+            keyed_index.setdefault((typename, elem2.key[1:]), []).append(
+                    (index, elem2))
+
     elem2s_both = set()
     for elem1 in old_node.h_elems:
         # should this element be ignored?
-        if elem1.typename in ignored_typenames:
+        typename = elem1.typename
+        if typename in ignored_typenames:
             continue
 
-        # XXX new_node won't contain an item with the same key; need to know
-        #     how many components to ignore; for now, assume 1 (the name of
-        #     the file that defined the model; see node.py Model._calckey())
-        elem2s = [elem2 for elem2 in new_node.h_elems if
-                  elem2.typename == elem1.typename and (
-                          not elem2.key or elem2.key[1:] == elem1.key[1:])]
+        # find the matching unkeyed and keyed elements, in their original
+        # order
+        unkeyed = unkeyed_index.get(typename, [])
+        keyed = keyed_index.get((typename, elem1.key[1:]), []) if \
+            elem1.key is not None else []
+        elem2s = [elem2 for _, elem2 in (
+            sorted(unkeyed + keyed) if unkeyed and keyed else
+            unkeyed or keyed)]
 
         # if there are multiple matches, try str()
         if len(elem2s) > 1:
-            elem2s = [elem2 for elem2 in new_node.h_elems if
-                      elem2.typename == elem1.typename and
-                      str(elem2) == str(elem1)]
+            str1 = str(elem1)
+            elem2s = [elem2 for elem2 in typename_index[typename] if
+                      str(elem2) == str1]
 
         # if there are no matches, it's been removed (this should be
         # highlighted by the format)
@@ -483,7 +577,8 @@ def node_diffs(old_node: Node, new_node: Node, *,
             func('%s: removed %s %s' % (
                 old_node.nicepath, elem1.typename, elem1.keylast or elem1))
             Diff.append(diffs, old_node, new_node, Entity.elem,
-                        Operation.removed, elem=elem1)
+                        Operation.removed, elem=elem1,
+                        model_item_nodes=model_item_nodes)
             continue
 
         # if there are multiple matches, it's an error
@@ -494,18 +589,19 @@ def node_diffs(old_node: Node, new_node: Node, *,
             continue
 
         elem2 = elem2s[0]
-        node_diffs(elem1, elem2,
-                   diffs=diffs, logger=logger, level=level + 1)
+        node_diffs(elem1, elem2, diffs=diffs, fingerprints=fingerprints,
+                   model_item_nodes=model_item_nodes, logger=logger,
+                   level=level + 1)
 
         elem2s_both.add(elem2)
 
     # check for added elems
-    elem2s_added = [elem2 for elem2 in new_node.h_elems if
+    elem2s_added = [elem2 for elem2 in new_elems if
                     elem2.typename not in ignored_typenames and
                     elem2 not in elem2s_both]
     for elem2 in elem2s_added:
         Diff.append(diffs, old_node, new_node, Entity.elem, Operation.added,
-                    elem=elem2)
+                    elem=elem2, model_item_nodes=model_item_nodes)
 
     # check for changed content
     # XXX should move the difflib logic to Content
@@ -517,6 +613,7 @@ def node_diffs(old_node: Node, new_node: Node, *,
             body1 = cont1.get_body_as_list(collapse=True)
             body2 = cont2.get_body_as_list(collapse=True)
             matcher = difflib.SequenceMatcher(None, body1, body2)
+            content_diffs = []
             done_header = False
             for tag, i1, i2, j1, j2 in matcher.get_opcodes():
                 chunk1 = body1[i1:i2]
@@ -531,27 +628,22 @@ def node_diffs(old_node: Node, new_node: Node, *,
                     continue
 
                 # check for a whitespace-only change
-                if all(isinstance(s, str) and (not s or s.isspace()) for s in
-                       chunk1) and all(
-                        isinstance(s, str) and (not s or s.isspace()) for s in
-                        chunk2):
+                if all(is_space_item(s) for s in chunk1) and \
+                        all(is_space_item(s) for s in chunk2):
                     is_whitespace = True
 
                 # this is a whitespace-only change, and is due to paragraph
                 # wrapping
                 # XXX for now, take the easy way out and compare them as
                 #     strings (will redo this later)
-                # XXX should generalize this to check for any 'close then
-                #     open' within a chunk, because this is harder to handle
-                para_sep = '[close(div), open(div), call(classes), argsep(|)]'
-                space_set = {"[' ']", "'\n\n'" '[call(nl)]', '[call(np)]'}
-                if str(chunk1) in space_set and str(chunk2) == para_sep:
+                str_chunk1, str_chunk2 = str(chunk1), str(chunk2)
+                if str_chunk1 in space_chunks and str_chunk2 == para_sep_chunk:
                     is_whitespace = True
 
                 # this is another whitespace-only change, and is due to using
                 # status="append" to append to a description
                 # XXX see the XXX comments to the above case
-                if str(chunk1) == para_sep and str(chunk2) in space_set:
+                if str_chunk1 == para_sep_chunk and str_chunk2 in space_chunks:
                     is_whitespace = True
 
                 # debug: output header if not already done
@@ -567,11 +659,60 @@ def node_diffs(old_node: Node, new_node: Node, *,
                              '%r -> %r' % (
                                  tag, i1, i2, j1, j2, white, chunk1, chunk2))
 
-                # append the diff
-                # XXX it would probably be better to add a single diff outside
-                #     this loop (it would make the logic clearer)
-                Diff.append(diffs, old_node, new_node, Entity.content,
-                            Operation.changed, name=tag,
-                            value=(i1, i2, chunk1), value2=(j1, j2, chunk2),
-                            is_whitespace=is_whitespace)
+                # collect the diff (they're all added after the loop)
+                # XXX it would probably be better to add a single diff (it
+                #     would make the logic clearer)
+                content_diffs.append(Diff(
+                        old_node, new_node, Entity.content, Operation.changed,
+                        name=tag, value=(i1, i2, chunk1),
+                        value2=(j1, j2, chunk2), is_whitespace=is_whitespace))
+            Diff.extend(diffs, new_node, content_diffs,
+                        model_item_nodes=model_item_nodes)
     return diffs
+
+
+# this is a tuple of everything that node_diffs() compares (and is cached,
+# so each node's subtree is only visited once); nodes with the same
+# fingerprint are the same, so node_diffs() wouldn't report any diffs
+# between them
+# XXX None is returned if the subtree contains elements that node_diffs()
+#     can't match unambiguously, i.e., an unkeyed element with a sibling of
+#     the same type, or keyed elements of the same type with the same key;
+#     node_diffs() reports diffs or errors for these even if they're the same
+def node_fingerprint(node: Node, *, fingerprints: dict[Node, Optional[tuple]]
+                     ) -> Optional[tuple]:
+    if node not in fingerprints:
+        fingerprints[node] = calc_fingerprint(node, fingerprints=fingerprints)
+    return fingerprints[node]
+
+
+def calc_fingerprint(node: Node, *, fingerprints: dict[Node, Optional[tuple]]
+                     ) -> Optional[tuple]:
+    elems = []
+    typenames, unkeyed_typenames, keys = set(), set(), set()
+    for elem in node.h_elems:
+        typename = elem.typename
+        if typename in ignored_typenames:
+            continue
+        if (elem_fingerprint := node_fingerprint(
+                elem, fingerprints=fingerprints)) is None:
+            return None
+
+        # see node_diffs() for how the key is used
+        key = elem.key[1:] if elem.key else None
+        if key is None:
+            if typename in typenames:
+                return None
+            unkeyed_typenames.add(typename)
+        else:
+            if typename in unkeyed_typenames or (typename, key) in keys:
+                return None
+            keys.add((typename, key))
+        typenames.add(typename)
+        elems.append((key, elem_fingerprint))
+
+    attrs = tuple((name, value) for name, value in sorted(node.attrs.items())
+                  if name not in ignored_attrnames)
+    content = (node.content.text, node.content.footer) if \
+        isinstance(node, _HasContent) else None
+    return node.typename, attrs, content, tuple(elems)
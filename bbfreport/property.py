@@ -83,6 +83,10 @@ class_hierarchy = Utility.class_hierarchy
 upper_first = Utility.upper_first
 whitespace = Utility.whitespace
 
+# used when checking int attribute values (this is precompiled, because it's
+# used once per parsed int attribute)
+int_pattern = re.compile(r'-?\d+')
+
 
 # this module knows about Nodes, but only as a concept: it knows very little
 # about the Node interface (such cases are usually noted)
@@ -940,7 +944,7 @@ class IntAttr(Attr):
                report: Optional[Report] = None) -> bool:
         """Check the supplied value is (or looks like) an int. Then set
         ``_value``."""
-        isint = isinstance(value, int) or re.match(r'-?\d+', value)
+        isint = isinstance(value, int) or int_pattern.match(value)
         assert isint, '%s: invalid %r value %r' % (report, self.name, value)
         return super()._merge(int(value) if isint else value, report=report)
 
@@ -954,7 +958,7 @@ class IntOrUnboundedAttr(Attr):
                report: Optional[Report] = None) -> bool:
         """Check the supplied value is (or looks like) an int, or is
         ``unbounded``. Then set ``_value``."""
-        isint = isinstance(value, int) or re.match(r'-?\d+', value)
+        isint = isinstance(value, int) or int_pattern.match(value)
         assert isint or value == 'unbounded', '%s: invalid %r value %r' % (
             report, self.name, value)
         return super()._merge(int(value) if isint else value, report=report)
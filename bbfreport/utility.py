@@ -41,11 +41,13 @@
 # license grant are also deemed granted under this license.
 
 import functools
+import importlib.util
 import re
 import os.path
+import sys
 import textwrap
-import xml.sax.saxutils as saxutils
 
+from types import ModuleType
 from typing import Any, Callable, cast, Iterable, Optional, \
     Union
 
@@ -54,6 +56,43 @@ from .logging import Logging
 logger = Logging.get_logger(__name__)
 
 
+def lazy_import(name: str) -> ModuleType:
+    """Import a module lazily, i.e., it's not executed until one of its
+    attributes is accessed.
+
+    This should be used for modules that are expensive to import and that
+    are often not needed. If the module has already been imported, it's
+    returned unchanged.
+
+    Args:
+        name: The absolute module name, e.g., ``xml.sax.saxutils``.
+
+    Returns:
+        The (possibly not yet executed) module.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # the import system normally sets the module as an attribute of its
+    # parent package; if this isn't done, a later 'import a.b' will find
+    # 'a.b' in sys.modules but 'a.b' won't be accessible
+    parent_name, _, child_name = name.rpartition('.')
+    if parent_name:
+        setattr(importlib.import_module(parent_name), child_name, module)
+    return module
+
+
+# saxutils imports urllib.request (and hence http.client, email etc.), and
+# it's only needed for generating XML
+saxutils = lazy_import('xml.sax.saxutils')
+
+
 # XXX Namespace, Version etc. classes should be moved to (new) types.py
 class Namespace:
     """Represents an XML namespace."""
@@ -829,6 +868,15 @@ class Utility:
         if exclude is None:
             exclude = []
 
+        # single-item lists are common, e.g. a reference's targetParent, so
+        # handle them directly
+        if len(value) == 1:
+            item = value[0]
+            return '' if item in exclude else \
+                template.replace(r'\1', item) if \
+                isinstance(template, str) else \
+                cast(Callable, template)(item)
+
         # 'last' normally has a space added before and after it, but no
         # leading space is added if it starts with a comma
         # XXX could extend this for checking for leading/trailing whitespace
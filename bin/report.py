@@ -82,18 +82,17 @@ assert sys.version_info[:2] >= MIN_VERSION, "You're using python %d.%d; you " \
 # if the bbfreport package is not installed, insert the current working
 # directory into the search path, so we can directly execute the tool from
 # the code
+# note that importing the package is cheap; the modules that do the real work
+# are only imported when they're needed, i.e., in get_argparser() and main()
 try:
-    from bbfreport import BBFReportException, Format, LayoutDoc, Logging, \
-        Null, Parser, Plugin, Root, Transform, Utility, version
+    from bbfreport import version
 except ModuleNotFoundError:
     sys.path.insert(0, os.getcwd())
-    from bbfreport import BBFReportException, Format, LayoutDoc, Logging, \
-        Null, Parser, Plugin, Root, Transform, Utility, version
+    from bbfreport import version
+from bbfreport.logging import Logging
 
 logger = Logging.get_logger(__file__, ispath=True)
 
-nice_list = Utility.nice_list
-
 # XXX should change everywhere to use list.append(item) rather than += [item]?
 
 # XXX note that 'arg: Foo = None' is implicitly 'arg: Optional[Foo] = None';
@@ -105,6 +104,10 @@ def get_argparser(argv=None, opts=None):
     if argv is None:
         argv = sys.argv
 
+    from bbfreport import Format, Parser, Plugin, Transform
+    from bbfreport.utility import Utility
+    nice_list = Utility.nice_list
+
     # XXX 0, 1, 2 are temporarily supported for backwards compatibility
     deprecated_loglevels = ('0', '1', '2')
     loglevels = ('none', 'fatal', 'error', 'warning', 'info',
@@ -316,6 +319,15 @@ def main(argv=None):
     if argv is None:
         argv = sys.argv
 
+    # if only the version was requested, report it without importing plugins
+    # etc. (this is quicker, and the result is the same)
+    if argv[1:] and set(argv[1:]) <= {'-v', '--version'}:
+        sys.stderr.write('%s\n' % version())
+        return 0
+
+    from bbfreport import LayoutDoc, Root
+    from bbfreport.macros.macros import clear_caches
+
     # get argument parser
     opts = {}
     arg_parser = get_argparser(argv=argv, opts=opts)
@@ -390,6 +402,7 @@ def main(argv=None):
         logger.error('transform or format requested early exit')
     else:
         root = Root(args=args)
+        clear_caches()
         for file in args.file:
             # XXX may want an option to control re-raise
             try: